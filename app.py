@@ -1,10 +1,18 @@
-from flask import Flask, render_template, request, redirect, session, url_for, flash
+from flask import Flask, render_template, request, redirect, session, url_for, flash, abort
 import mysql.connector
 import string
 import random
 import os
+import atexit
+import hmac
+import logging
+import threading
+from collections import OrderedDict
+from mysql.connector import pooling
 from dotenv import load_dotenv
 import re
+from redirect_index import CompactRedirectIndex
+from db_profiler import QueryProfiler, logger as db_logger
 
 # Load environment variables from .env file
 load_dotenv()
@@ -22,12 +30,73 @@ DB_CONFIG = {
     'autocommit': True
 }
 
+# Per-worker resource sizing (set by gunicorn.conf.py in production).
+# 0 disables the connection pool / redirect cache.
+DB_POOL_SIZE = int(os.environ.get('DB_POOL_SIZE', '0'))
+REDIRECT_CACHE_SIZE = int(os.environ.get('REDIRECT_CACHE_SIZE', '0'))
+# Optional snapshot built with `python redirect_index.py build <path>`
+REDIRECT_INDEX_PATH = os.environ.get('REDIRECT_INDEX_PATH')
+
+# Opt-in query profiling; see db_profiler.py
+DB_PROFILE = os.environ.get('DB_PROFILE', '').lower() in ('1', 'true', 'yes')
+DB_SLOW_QUERY_MS = float(os.environ.get('DB_SLOW_QUERY_MS', '100'))
+# Required in the X-DB-Profile-Token header to read or reset the report
+DB_PROFILE_TOKEN = os.environ.get('DB_PROFILE_TOKEN')
+
+_db_pool = None
+_db_pool_pid = None
+_db_pool_lock = threading.Lock()
+
+
+def _get_db_pool():
+    """Return this process's connection pool, creating it on first use.
+
+    The pool is keyed on the process id so that a worker forked from a
+    master which already touched the database never shares its sockets.
+    """
+    global _db_pool, _db_pool_pid
+    with _db_pool_lock:
+        if _db_pool is None or _db_pool_pid != os.getpid():
+            _db_pool = pooling.MySQLConnectionPool(
+                pool_name=f"urlshortener-{os.getpid()}",
+                pool_size=min(DB_POOL_SIZE, pooling.CNX_POOL_MAXSIZE),
+                # The app keeps no session state, so skip the reset round
+                # trip each time a connection goes back to the pool
+                pool_reset_session=False,
+                **DB_CONFIG
+            )
+            _db_pool_pid = os.getpid()
+        return _db_pool
+
+
+def _connect():
+    """Borrow a pooled connection, or open a direct one.
+
+    mysql-connector pools never block, so when every pooled connection is
+    checked out we fall back to a direct connection instead of failing.
+    """
+    if DB_POOL_SIZE > 0:
+        try:
+            return _get_db_pool().get_connection()
+        except mysql.connector.errors.PoolError:
+            pass
+    return mysql.connector.connect(**DB_CONFIG)
+
+
+# EXPLAIN borrows an unprofiled connection from the same pool
+db_profiler = QueryProfiler(DB_SLOW_QUERY_MS, explain_connect=_connect) if DB_PROFILE else None
+
 
 def get_db():
-    """Get MySQL database connection."""
+    """Get MySQL database connection.
+
+    When DB_POOL_SIZE is set the connection is borrowed from a per-process
+    pool; closing it returns it to the pool. When DB_PROFILE is set its
+    cursors are profiled.
+    """
     try:
-        conn = mysql.connector.connect(**DB_CONFIG)
-        return conn
+        conn = _connect()
+        return db_profiler.wrap(conn) if db_profiler is not None else conn
     except mysql.connector.Error as err:
         print(f"Error connecting to MySQL: {err}")
         raise
@@ -48,8 +117,9 @@ def init_db():
         cursor.close()
         conn.close()
         
-        # Now connect to the specific database
-        conn = get_db()
+        # Now connect to the specific database. This bypasses get_db() so
+        # that a gunicorn master running init_db() never builds a pool.
+        conn = mysql.connector.connect(**DB_CONFIG)
         cursor = conn.cursor()
         
         # Create users table
@@ -84,6 +154,55 @@ def init_db():
         raise
 
 
+class RedirectCache:
+    """Bounded LRU of short_code -> long_url, local to one worker process.
+
+    Only hits are cached: short codes are never rewritten once created, but
+    a code that is missing now may be created later.
+    """
+
+    def __init__(self, maxsize):
+        self.maxsize = maxsize
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, code):
+        with self._lock:
+            long_url = self._entries.get(code)
+            if long_url is not None:
+                self._entries.move_to_end(code)
+            return long_url
+
+    def put(self, code, long_url):
+        if self.maxsize <= 0:
+            return
+        with self._lock:
+            self._entries[code] = long_url
+            self._entries.move_to_end(code)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+
+redirect_cache = RedirectCache(REDIRECT_CACHE_SIZE)
+# Loaded at import so a preloading gunicorn master shares it with its workers
+redirect_index = None
+if REDIRECT_INDEX_PATH:
+    if os.path.exists(REDIRECT_INDEX_PATH):
+        redirect_index = CompactRedirectIndex.load(REDIRECT_INDEX_PATH)
+    else:
+        # Also lets `python redirect_index.py build` create the file the
+        # first time, since it imports this module for get_db()
+        app.logger.warning("Redirect index %s not found; serving redirects from the database",
+                           REDIRECT_INDEX_PATH)
+
+
 @app.route('/', methods=['GET', 'POST'])
 def index():
     if request.method == 'POST':
@@ -123,6 +242,13 @@ def index():
 
 @app.route('/<code>')
 def redirect_url(code):
+    # Codes created after the snapshot was taken fall through to the cache/DB
+    long_url = redirect_index.get(code) if redirect_index is not None else None
+    if long_url is None:
+        long_url = redirect_cache.get(code)
+    if long_url is not None:
+        return redirect(long_url)
+
     conn = get_db()
     cursor = conn.cursor(dictionary=True)
     
@@ -130,6 +256,7 @@ def redirect_url(code):
         cursor.execute('SELECT long_url FROM urls WHERE short_code = %s', (code,))
         url = cursor.fetchone()
         if url:
+            redirect_cache.put(code, url['long_url'])
             return redirect(url['long_url'])
         else:
             return render_template('error.html'), 404
@@ -193,7 +320,40 @@ def register():
     return render_template('register.html')
 
 
+@app.route('/admin/db-profile', methods=['GET', 'POST'])
+def db_profile():
+    """Per-route query report for this worker process; POST resets it.
+
+    Under gunicorn each worker profiles separately, so this only reads or
+    resets the worker that happens to handle the request.
+    """
+    if db_profiler is None or not DB_PROFILE_TOKEN:
+        abort(404)
+    token = request.headers.get('X-DB-Profile-Token', '')
+    if not hmac.compare_digest(token.encode(), DB_PROFILE_TOKEN.encode()):
+        abort(403)
+    if request.method == 'POST':
+        db_profiler.reset()
+        body = f"pid {os.getpid()}\nProfile reset.\n"
+    else:
+        body = f"pid {os.getpid()}\n" + db_profiler.report()
+    return body, 200, {'Content-Type': 'text/plain; charset=utf-8'}
+
+
+if db_profiler is not None:
+    if not db_logger.handlers:
+        db_logger.addHandler(logging.StreamHandler())
+    db_logger.setLevel(logging.INFO)
+    @atexit.register
+    def _log_db_profile():
+        # Each gunicorn worker logs its own report when it exits; the master
+        # serves no requests, so it has nothing to report
+        if db_profiler.snapshot():
+            db_logger.info("DB profile (pid %d):\n%s", os.getpid(), db_profiler.report())
+
+
 if __name__ == '__main__':
+    # Development server only; production runs under gunicorn.conf.py
     init_db()
     app.run(debug=True)
     
\ No newline at end of file
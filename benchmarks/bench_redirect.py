@@ -0,0 +1,148 @@
+"""Benchmark redirect throughput as gunicorn workers scale from 1 to N cores.
+
+Seeds one short URL, then for each worker count starts the production
+server (gunicorn.conf.py) on a local port and hammers GET /<code> from a
+pool of client processes using keep-alive connections.
+
+Each worker count is measured with the per-worker redirect cache enabled
+(requests after the first are served from memory) and disabled (every
+request reads MySQL through the worker's connection pool).
+
+Usage:
+    python benchmarks/bench_redirect.py [--max-workers N] [--duration S]
+                                        [--cache on|off|both]
+
+Requires a reachable MySQL server configured as for app.py. The load
+generator runs on the same machine, so at high worker counts it competes
+with the server for cores; treat the numbers as relative scaling.
+"""
+import argparse
+import http.client
+import multiprocessing
+import os
+import socket
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from app import init_db, get_db  # noqa: E402
+
+BENCH_CODE = 'benchredir'
+BENCH_URL = 'https://example.com/benchmark-target'
+
+
+def seed_url():
+    """Make sure the benchmark short code exists."""
+    init_db()
+    conn = get_db()
+    cursor = conn.cursor()
+    cursor.execute('DELETE FROM urls WHERE short_code = %s', (BENCH_CODE,))
+    cursor.execute(
+        'INSERT INTO urls (long_url, short_code, user) VALUES (%s, %s, %s)',
+        (BENCH_URL, BENCH_CODE, None)
+    )
+    conn.commit()
+    cursor.close()
+    conn.close()
+
+
+def wait_for_port(port, timeout=30):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            with socket.create_connection(('127.0.0.1', port), timeout=1):
+                return
+        except OSError:
+            time.sleep(0.2)
+    raise RuntimeError(f"Server did not start on port {port}")
+
+
+def client_loop(args):
+    """Issue redirects for `duration` seconds; return the number that succeeded."""
+    port, duration = args
+    conn = http.client.HTTPConnection('127.0.0.1', port)
+    done = 0
+    deadline = time.time() + duration
+    while time.time() < deadline:
+        try:
+            conn.request('GET', f'/{BENCH_CODE}')
+            response = conn.getresponse()
+            response.read()
+            if response.status == 302:
+                done += 1
+        except (http.client.HTTPException, OSError):
+            conn.close()
+            conn = http.client.HTTPConnection('127.0.0.1', port)
+    conn.close()
+    return done
+
+
+def run_once(workers, port, duration, clients, cache_size):
+    env = dict(os.environ, REDIRECT_CACHE_SIZE=str(cache_size))
+    server = subprocess.Popen(
+        [sys.executable, '-m', 'gunicorn', '-c', 'gunicorn.conf.py',
+         '--workers', str(workers), '--bind', f'127.0.0.1:{port}', 'app:app'],
+        cwd=ROOT,
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    try:
+        wait_for_port(port)
+        with multiprocessing.Pool(clients) as pool:
+            # Short warm-up with the full client pool. Each keep-alive
+            # connection sticks to whichever worker accepted it, so this
+            # reaches most but not necessarily all workers.
+            pool.map(client_loop, [(port, 1)] * clients)
+            start = time.time()
+            total = sum(pool.map(client_loop, [(port, duration)] * clients))
+            elapsed = time.time() - start
+        return total / elapsed
+    finally:
+        server.terminate()
+        server.wait()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--max-workers', type=int, default=multiprocessing.cpu_count())
+    parser.add_argument('--duration', type=float, default=10.0)
+    parser.add_argument('--clients-per-worker', type=int, default=4)
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--cache', choices=['on', 'off', 'both'], default='both',
+                        help='run with the per-worker redirect cache on, off, or both')
+    parser.add_argument('--cache-size', type=int, default=10000)
+    args = parser.parse_args()
+
+    seed_url()
+
+    counts = []
+    n = 1
+    while n < args.max_workers:
+        counts.append(n)
+        n *= 2
+    counts.append(args.max_workers)
+
+    modes = []
+    if args.cache in ('on', 'both'):
+        modes.append(('cache', args.cache_size))
+    if args.cache in ('off', 'both'):
+        modes.append(('no cache', 0))
+
+    for label, cache_size in modes:
+        print(f"REDIRECT_CACHE_SIZE={cache_size} ({label})")
+        print(f"{'workers':>8} {'req/s':>10} {'speedup':>8}")
+        baseline = None
+        for workers in counts:
+            rate = run_once(workers, args.port, args.duration,
+                            args.clients_per_worker * workers, cache_size)
+            baseline = baseline or rate
+            print(f"{workers:>8} {rate:>10.0f} {rate / baseline:>7.2f}x")
+        print()
+
+
+if __name__ == '__main__':
+    main()
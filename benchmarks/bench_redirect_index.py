@@ -0,0 +1,91 @@
+"""Compare memory and lookup cost of a dict vs. CompactRedirectIndex.
+
+Generates N random 6-character codes with realistic-length URLs (no
+database needed) and reports bytes per entry and lookups per second for
+both representations.
+
+Usage:
+    python benchmarks/bench_redirect_index.py [--entries N]
+"""
+import argparse
+import os
+import random
+import string
+import sys
+import tempfile
+import time
+import tracemalloc
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from redirect_index import CompactRedirectIndex  # noqa: E402
+
+
+def make_items(count, seed=0):
+    rng = random.Random(seed)
+    alphabet = string.ascii_letters + string.digits
+    items = {}
+    while len(items) < count:
+        code = ''.join(rng.choices(alphabet, k=6))
+        path = ''.join(rng.choices(string.ascii_lowercase, k=rng.randint(20, 60)))
+        items[code] = f'https://www.example.com/{path}'
+    return list(items.items())
+
+
+def measure(build):
+    """Return (result, bytes allocated while building it)."""
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    result = build()
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return result, after - before
+
+
+def lookups_per_second(get, codes):
+    start = time.perf_counter()
+    for code in codes:
+        get(code)
+    return len(codes) / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--entries', type=int, default=1_000_000)
+    parser.add_argument('--lookups', type=int, default=200_000)
+    args = parser.parse_args()
+
+    items = make_items(args.entries)
+    url_bytes = sum(len(url) for _, url in items)
+    probe = [code for code, _ in random.Random(1).choices(items, k=args.lookups)]
+
+    # Decode fresh strings so the dict is charged for them, as it would be
+    # when filled from database rows
+    table, dict_bytes = measure(
+        lambda: {c.encode().decode(): u.encode().decode() for c, u in items}
+    )
+    index, index_bytes = measure(lambda: CompactRedirectIndex.build(items))
+
+    with tempfile.NamedTemporaryFile(suffix='.idx', delete=False) as f:
+        path = f.name
+    try:
+        index.save(path)
+        mapped, mapped_bytes = measure(lambda: CompactRedirectIndex.load(path))
+        rows = [
+            ('dict', dict_bytes, lookups_per_second(table.get, probe)),
+            ('compact', index_bytes, lookups_per_second(index.get, probe)),
+            ('compact (mmap)', mapped_bytes, lookups_per_second(mapped.get, probe)),
+        ]
+    finally:
+        os.unlink(path)
+
+    print(f"{args.entries} entries, average URL {url_bytes / args.entries:.0f} bytes")
+    print(f"{'representation':<16} {'bytes/entry':>12} {'lookups/s':>12}")
+    for name, nbytes, rate in rows:
+        print(f"{name:<16} {nbytes / args.entries:>12.1f} {rate:>12.0f}")
+    print("(mmap bytes are Python heap only; the file is shared via the page cache)")
+
+
+if __name__ == '__main__':
+    main()
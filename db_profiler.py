@@ -0,0 +1,194 @@
+"""Opt-in per-query profiling for connections returned by get_db().
+
+When enabled (DB_PROFILE=1), every cursor's execute() is timed and
+recorded under the current Flask endpoint and a fingerprint of the
+statement, with literals and placeholders replaced by `?`. Statements
+slower than the threshold are logged together with their EXPLAIN plan,
+so you can see whether a lookup actually used an index. The plan is
+fetched once per fingerprint and reused for later slow executions.
+
+Only time spent in execute() is measured. Query parameters are never
+recorded or logged.
+"""
+import logging
+import re
+import threading
+import time
+
+from flask import has_request_context, request
+
+logger = logging.getLogger('urlshortener.db')
+
+_STRING = re.compile(r"'(?:[^'\\]|\\.)*'|\"(?:[^\"\\]|\\.)*\"")
+_NUMBER = re.compile(r'\b\d+(?:\.\d+)?\b')
+_PLACEHOLDER = re.compile(r'%s|%\(\w+\)s')
+_IN_LIST = re.compile(r'\(\s*\?(?:\s*,\s*\?)*\s*\)')
+_WHITESPACE = re.compile(r'\s+')
+_EXPLAINABLE = ('SELECT', 'INSERT', 'UPDATE', 'DELETE', 'REPLACE')
+
+
+def fingerprint(sql):
+    """Normalise `sql` so that statements differing only in values match."""
+    sql = _STRING.sub('?', sql)
+    sql = _PLACEHOLDER.sub('?', sql)
+    sql = _NUMBER.sub('?', sql)
+    sql = _IN_LIST.sub('(...)', sql)
+    return _WHITESPACE.sub(' ', sql).strip()
+
+
+class QueryStats:
+    """Call count and timings for one statement fingerprint on one route."""
+
+    __slots__ = ('calls', 'total', 'max')
+
+    def __init__(self):
+        self.calls = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def add(self, elapsed):
+        self.calls += 1
+        self.total += elapsed
+        self.max = max(self.max, elapsed)
+
+
+class QueryProfiler:
+    """Collects query statistics for the current process."""
+
+    def __init__(self, slow_query_ms, explain_connect=None):
+        self.slow_query_ms = slow_query_ms
+        self._explain_connect = explain_connect
+        self._stats = {}
+        self._plans = {}
+        self._lock = threading.Lock()
+
+    def wrap(self, conn):
+        """Return `conn` with its cursors profiled."""
+        return ProfiledConnection(conn, self)
+
+    def record(self, sql, params, elapsed):
+        route = (request.endpoint or request.path) if has_request_context() else '<no request>'
+        key = (route, fingerprint(sql))
+        with self._lock:
+            stats = self._stats.get(key)
+            if stats is None:
+                stats = self._stats[key] = QueryStats()
+            stats.add(elapsed)
+
+        if elapsed * 1000 >= self.slow_query_ms:
+            logger.warning(
+                "Slow query (%.1f ms) on %s: %s\n%s",
+                elapsed * 1000, route, key[1], self.plan(key[1], sql, params)
+            )
+
+    def plan(self, fp, sql, params):
+        """Return the cached EXPLAIN plan for fingerprint `fp`.
+
+        Only the first successful EXPLAIN of a fingerprint is run, so a slow
+        database is not hit with an extra query per slow request. Failures
+        are not cached; the next slow execution tries again.
+        """
+        with self._lock:
+            cached = self._plans.get(fp)
+            if cached is not None:
+                return cached
+            # Claim the fingerprint so concurrent slow requests don't all explain it
+            self._plans[fp] = '  (EXPLAIN in progress)'
+        try:
+            plan = self.explain(sql, params)
+        except Exception as err:
+            with self._lock:
+                self._plans.pop(fp, None)
+            return f'  (EXPLAIN failed: {err})'
+        with self._lock:
+            self._plans[fp] = plan
+        return plan
+
+    def explain(self, sql, params):
+        """Return the EXPLAIN plan for `sql` as text.
+
+        The plan is fetched over another connection from `explain_connect`,
+        because the cursor that ran the slow statement may still have
+        unread rows. Errors propagate to the caller.
+        """
+        if self._explain_connect is None or not sql.lstrip().upper().startswith(_EXPLAINABLE):
+            return '  (no plan)'
+        conn = self._explain_connect()
+        try:
+            cursor = conn.cursor()
+            cursor.execute('EXPLAIN ' + sql, params)
+            columns = [column[0] for column in cursor.description]
+            rows = cursor.fetchall()
+            cursor.close()
+        finally:
+            conn.close()
+        return '\n'.join(
+            '  ' + ', '.join(f'{name}={value}' for name, value in zip(columns, row))
+            for row in rows
+        )
+
+    def snapshot(self):
+        """Return {(route, fingerprint): (calls, total, max)}."""
+        with self._lock:
+            return {key: (s.calls, s.total, s.max) for key, s in self._stats.items()}
+
+    def reset(self):
+        with self._lock:
+            self._stats.clear()
+            self._plans.clear()
+
+    def report(self):
+        """Return a text report, routes and queries ranked by total time."""
+        by_route = {}
+        for (route, sql), stats in self.snapshot().items():
+            by_route.setdefault(route, []).append((sql, *stats))
+        if not by_route:
+            return 'No queries recorded.\n'
+
+        lines = []
+        ranked = sorted(by_route.items(), key=lambda item: -sum(q[2] for q in item[1]))
+        for route, queries in ranked:
+            lines.append(f'{route}  ({sum(q[2] for q in queries) * 1000:.1f} ms total)')
+            lines.append(f"  {'calls':>7} {'total ms':>10} {'avg ms':>8} {'max ms':>8}  query")
+            for sql, calls, total, longest in sorted(queries, key=lambda q: -q[2]):
+                lines.append(
+                    f'  {calls:>7} {total * 1000:>10.1f} {total * 1000 / calls:>8.2f} '
+                    f'{longest * 1000:>8.2f}  {sql}'
+                )
+            lines.append('')
+        return '\n'.join(lines)
+
+
+class ProfiledConnection:
+    """Proxy for a MySQL connection whose cursors are profiled."""
+
+    def __init__(self, conn, profiler):
+        self._conn = conn
+        self._profiler = profiler
+
+    def cursor(self, *args, **kwargs):
+        return ProfiledCursor(self._conn.cursor(*args, **kwargs), self._profiler)
+
+    def __getattr__(self, name):
+        return getattr(self._conn, name)
+
+
+class ProfiledCursor:
+    """Proxy for a MySQL cursor that times each execute()."""
+
+    def __init__(self, cursor, profiler):
+        self._cursor = cursor
+        self._profiler = profiler
+
+    def execute(self, operation, params=None, *args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return self._cursor.execute(operation, params, *args, **kwargs)
+        finally:
+            self._profiler.record(operation, params, time.perf_counter() - start)
+
+    def __iter__(self):
+        return iter(self._cursor)
+
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)
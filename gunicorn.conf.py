@@ -0,0 +1,71 @@
+"""Gunicorn configuration for serving the URL shortener in production.
+
+Start the server with:
+    gunicorn -c gunicorn.conf.py app:app
+
+The master preloads the app and forks one worker per CPU core. Each worker
+runs a small thread pool and sizes its own MySQL connection pool (in
+post_fork) and redirect cache from the settings below.
+
+Graceful reload:
+    kill -HUP <master pid>    re-read this file and replace workers gracefully
+    kill -USR2 <master pid>   start a new master with new code, then
+    kill -TERM <old master>   once the new workers are serving
+"""
+import multiprocessing
+import os
+
+bind = os.environ.get('BIND', '0.0.0.0:8000')
+
+# One worker process per core, each serving requests on a few threads
+workers = int(os.environ.get('WEB_CONCURRENCY', multiprocessing.cpu_count()))
+worker_class = 'gthread'
+threads = int(os.environ.get('GUNICORN_THREADS', '4'))
+
+# Load the app once in the master so workers share its memory copy-on-write
+preload_app = True
+
+# Recycle each worker after N requests to bound memory growth; the jitter
+# keeps workers from all restarting at the same time
+max_requests = int(os.environ.get('GUNICORN_MAX_REQUESTS', '10000'))
+max_requests_jitter = int(os.environ.get('GUNICORN_MAX_REQUESTS_JITTER', '1000'))
+
+timeout = int(os.environ.get('GUNICORN_TIMEOUT', '30'))
+graceful_timeout = int(os.environ.get('GUNICORN_GRACEFUL_TIMEOUT', '30'))
+keepalive = int(os.environ.get('GUNICORN_KEEPALIVE', '5'))
+
+accesslog = os.environ.get('GUNICORN_ACCESS_LOG')  # e.g. '-' for stdout
+errorlog = '-'
+
+# Per-worker redirect cache, read by app.py at import time
+os.environ.setdefault('REDIRECT_CACHE_SIZE', '10000')
+
+
+def when_ready(server):
+    """Create the database and tables once, before workers are forked.
+
+    A database outage must not stop the server (or a USR2 upgrade) from
+    starting; requests connect lazily and recover once MySQL is back.
+    """
+    import mysql.connector
+    from app import init_db
+
+    try:
+        init_db()
+    except mysql.connector.Error as err:
+        server.log.warning("Skipping database initialization: %s", err)
+
+
+def post_fork(server, worker):
+    """Size this worker's connection pool to its thread count.
+
+    Every thread holds at most one connection. The size is taken from the
+    final worker config so --threads and GUNICORN_CMD_ARGS apply, and is
+    capped at mysql-connector's pool limit; threads beyond it fall back to
+    direct connections. DB_POOL_SIZE in the environment takes precedence.
+    """
+    import app
+    from mysql.connector import pooling
+
+    if 'DB_POOL_SIZE' not in os.environ:
+        app.DB_POOL_SIZE = min(worker.cfg.threads, pooling.CNX_POOL_MAXSIZE)
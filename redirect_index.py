@@ -0,0 +1,250 @@
+"""Compact resident index of short_code -> long_url for redirect lookups.
+
+A Python dict of str -> str costs a few hundred bytes per entry. This index
+stores the same mapping in flat buffers:
+
+    keys     sorted 64-bit integers, one per short code (8 bytes/entry)
+    offsets  start of each URL in `urls`, plus a final end offset (8 bytes/entry)
+    urls     every long URL as UTF-8, concatenated (len(url) bytes/entry)
+
+so an entry costs 16 bytes plus the URL itself. Lookups base62-decode the
+code and binary search `keys`. Codes that do not fit in 64 bits (longer
+than 10 characters or not alphanumeric, as custom codes often are) go to a
+second table of UTF-8 codes sorted bytewise, each with its own offsets, at
+24 bytes plus the code and URL per entry.
+
+The buffers are single objects, so an index built before gunicorn forks
+its workers stays shared copy-on-write; an index saved to disk and opened
+with `load()` is mmapped and shared through the page cache.
+
+Build a snapshot from the database with:
+    python redirect_index.py build redirects.idx
+"""
+import mmap
+import os
+import string
+import struct
+import sys
+import tempfile
+from array import array
+from bisect import bisect_left
+
+ALPHABET = string.digits + string.ascii_letters
+MAX_CODE_LENGTH = 10
+
+_DIGITS = {char: value for value, char in enumerate(ALPHABET, start=1)}
+_MAGIC = b'URLIDX02'
+# magic, packed entries, url bytes, overflow entries, overflow code bytes, overflow url bytes
+_HEADER = struct.Struct('<8sQQQQQ')
+# Offsets are stored little-endian like the header
+_NATIVE_LITTLE_ENDIAN = sys.byteorder == 'little'
+
+
+def _pack_u64(values):
+    """Return `values` as little-endian unsigned 64-bit bytes."""
+    if _NATIVE_LITTLE_ENDIAN:
+        return bytes(values)
+    swapped = array('Q', values)
+    swapped.byteswap()
+    return swapped.tobytes()
+
+
+def _unpack_u64(view):
+    """Return a sequence of integers over little-endian 64-bit `view`.
+
+    On little-endian hosts this is a zero-copy view of the mapping; on
+    big-endian hosts the values are copied and byte-swapped.
+    """
+    if _NATIVE_LITTLE_ENDIAN:
+        return view.cast('Q')
+    values = array('Q', bytes(view))
+    values.byteswap()
+    return values
+
+
+class _StringTable:
+    """Sequence of byte strings stored back to back in one buffer."""
+
+    def __init__(self, offsets, data):
+        self.offsets = offsets
+        self.data = data
+
+    @classmethod
+    def build(cls, values):
+        offsets = array('Q', [0])
+        data = bytearray()
+        for value in values:
+            data += value
+            offsets.append(len(data))
+        return cls(offsets, bytes(data))
+
+    def __getitem__(self, i):
+        return bytes(self.data[self.offsets[i]:self.offsets[i + 1]])
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def nbytes(self):
+        return 8 * len(self.offsets) + len(self.data)
+
+
+def encode_code(code):
+    """Return `code` as an integer, or None if it cannot be packed.
+
+    Digits count from 1 (bijective base 62) so codes of different lengths
+    never collide, e.g. '0' and '00' map to different keys.
+    """
+    if not code or len(code) > MAX_CODE_LENGTH:
+        return None
+    value = 0
+    for char in code:
+        digit = _DIGITS.get(char)
+        if digit is None:
+            return None
+        value = value * 62 + digit
+    return value
+
+
+class CompactRedirectIndex:
+    """Read-only short_code -> long_url mapping held in flat buffers."""
+
+    def __init__(self, keys, urls, overflow_codes, overflow_urls, mapped=None):
+        self._keys = keys
+        self._urls = urls
+        self._overflow_codes = overflow_codes
+        self._overflow_urls = overflow_urls
+        self._mmap = mapped
+
+    @classmethod
+    def build(cls, items):
+        """Build an index from an iterable of (short_code, long_url) pairs."""
+        packed = []
+        overflow = []
+        for code, long_url in items:
+            key = encode_code(code)
+            if key is None:
+                overflow.append((code.encode('utf-8'), long_url.encode('utf-8')))
+            else:
+                packed.append((key, long_url.encode('utf-8')))
+        packed.sort(key=lambda entry: entry[0])
+        overflow.sort(key=lambda entry: entry[0])
+
+        return cls(
+            array('Q', (key for key, _ in packed)),
+            _StringTable.build(url for _, url in packed),
+            _StringTable.build(code for code, _ in overflow),
+            _StringTable.build(url for _, url in overflow),
+        )
+
+    @classmethod
+    def load(cls, path):
+        """Open an index written by `save()`, mapping it into memory."""
+        with open(path, 'rb') as f:
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if len(mapped) < _HEADER.size or mapped[:8] != _MAGIC:
+            mapped.close()
+            raise ValueError(f"{path} is not a redirect index")
+        _, count, url_bytes, overflow_count, code_bytes, overflow_url_bytes = \
+            _HEADER.unpack_from(mapped)
+
+        view = memoryview(mapped)
+        position = _HEADER.size
+
+        def take(size):
+            nonlocal position
+            section = view[position:position + size]
+            position += size
+            return section
+
+        keys = _unpack_u64(take(8 * count))
+        urls = _StringTable(_unpack_u64(take(8 * (count + 1))), take(url_bytes))
+        overflow_codes = _StringTable(_unpack_u64(take(8 * (overflow_count + 1))), take(code_bytes))
+        overflow_urls = _StringTable(
+            _unpack_u64(take(8 * (overflow_count + 1))), take(overflow_url_bytes)
+        )
+        return cls(keys, urls, overflow_codes, overflow_urls, mapped)
+
+    def save(self, path):
+        """Write the index to `path` in the format read by `load()`.
+
+        The file is written next to `path` and renamed over it, so processes
+        that still have the old index mapped keep reading the old inode
+        instead of a file truncated underneath them.
+        """
+        fd, tmp_path = tempfile.mkstemp(
+            dir=os.path.dirname(os.path.abspath(path)),
+            prefix=os.path.basename(path) + '.',
+            suffix='.tmp'
+        )
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(_HEADER.pack(
+                    _MAGIC, len(self._keys), len(self._urls.data),
+                    len(self._overflow_codes), len(self._overflow_codes.data),
+                    len(self._overflow_urls.data)
+                ))
+                f.write(_pack_u64(self._keys))
+                for table in (self._urls, self._overflow_codes, self._overflow_urls):
+                    f.write(_pack_u64(table.offsets))
+                    f.write(bytes(table.data))
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+
+    def get(self, code):
+        """Return the long URL for `code`, or None if it is not indexed."""
+        key = encode_code(code)
+        if key is None:
+            codes, urls, key = self._overflow_codes, self._overflow_urls, code.encode('utf-8')
+        else:
+            codes, urls = self._keys, self._urls
+        i = bisect_left(codes, key)
+        if i == len(codes) or codes[i] != key:
+            return None
+        return urls[i].decode('utf-8')
+
+    def __contains__(self, code):
+        return self.get(code) is not None
+
+    def __len__(self):
+        return len(self._keys) + len(self._overflow_codes)
+
+    @property
+    def overflow_count(self):
+        """Number of codes held in the (slower, larger) overflow table."""
+        return len(self._overflow_codes)
+
+    def nbytes(self):
+        """Bytes held by all packed buffers, overflow table included."""
+        return (8 * len(self._keys) + self._urls.nbytes()
+                + self._overflow_codes.nbytes() + self._overflow_urls.nbytes())
+
+
+def build_from_db(conn):
+    """Build an index from every row of the urls table."""
+    cursor = conn.cursor()
+    try:
+        cursor.execute('SELECT short_code, long_url FROM urls')
+        return CompactRedirectIndex.build(cursor)
+    finally:
+        cursor.close()
+
+
+if __name__ == '__main__':
+    if len(sys.argv) != 3 or sys.argv[1] != 'build':
+        print("Usage: python redirect_index.py build <path>")
+        sys.exit(1)
+
+    from app import get_db
+
+    conn = get_db()
+    try:
+        index = build_from_db(conn)
+    finally:
+        conn.close()
+    index.save(sys.argv[2])
+    print(f"Wrote {len(index)} redirects ({index.overflow_count} in the overflow table, "
+          f"{index.nbytes()} bytes packed) to {sys.argv[2]}")
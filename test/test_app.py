@@ -318,3 +318,130 @@ def test_flash_messages_display(client):
     response = client.get('/login')
     assert response.status_code == 200
     assert b'Login' in response.data
+
+def test_redirect_cache_evicts_least_recently_used():
+    """Test the per-worker redirect cache stays within its size bound."""
+    from app import RedirectCache
+    cache = RedirectCache(2)
+    cache.put('a', 'https://a.example')
+    cache.put('b', 'https://b.example')
+    cache.get('a')
+    cache.put('c', 'https://c.example')
+    assert len(cache) == 2
+    assert cache.get('a') == 'https://a.example'
+    assert cache.get('b') is None
+
+def test_redirect_cache_disabled():
+    """Test a zero-sized redirect cache stores nothing."""
+    from app import RedirectCache
+    cache = RedirectCache(0)
+    cache.put('a', 'https://a.example')
+    assert cache.get('a') is None
+
+class FakePool:
+    """Stand-in for MySQLConnectionPool that tracks checked-out connections."""
+    created = []
+
+    def __init__(self, pool_name, pool_size, **config):
+        self.pool_size = pool_size
+        self.config = config
+        self.available = pool_size
+        FakePool.created.append(self)
+
+    def get_connection(self):
+        if self.available == 0:
+            raise mysql.connector.errors.PoolError('Failed getting connection; pool exhausted')
+        self.available -= 1
+        return FakePooledConnection(self)
+
+class FakePooledConnection:
+    def __init__(self, pool):
+        self.pool = pool
+
+    def close(self):
+        self.pool.available += 1
+
+@pytest.fixture
+def fake_pool(monkeypatch):
+    """Enable the connection pool in app.py backed by FakePool."""
+    import app as app_module
+    FakePool.created = []
+    monkeypatch.setattr(app_module.pooling, 'MySQLConnectionPool', FakePool)
+    monkeypatch.setattr(app_module, 'DB_POOL_SIZE', 2)
+    monkeypatch.setattr(app_module, 'db_profiler', None)
+    monkeypatch.setattr(app_module, '_db_pool', None)
+    monkeypatch.setattr(app_module, '_db_pool_pid', None)
+    return app_module
+
+def test_get_db_uses_one_pool_per_process(fake_pool, monkeypatch):
+    """Test connections come from a pool created once per process id."""
+    monkeypatch.setattr(fake_pool.os, 'getpid', lambda: 100)
+    conn = fake_pool.get_db()
+    assert len(FakePool.created) == 1
+    assert FakePool.created[0].available == 1
+    conn.close()
+    assert FakePool.created[0].available == 2
+
+    fake_pool.get_db().close()
+    assert len(FakePool.created) == 1
+
+    # A forked worker sees a new pid and must not reuse the parent's pool
+    monkeypatch.setattr(fake_pool.os, 'getpid', lambda: 101)
+    fake_pool.get_db().close()
+    assert len(FakePool.created) == 2
+
+def test_get_db_falls_back_when_pool_exhausted(fake_pool, monkeypatch):
+    """Test an exhausted pool yields a direct connection instead of an error."""
+    direct = object()
+    monkeypatch.setattr(fake_pool.mysql.connector, 'connect', lambda **config: direct)
+    fake_pool.get_db()
+    fake_pool.get_db()
+    assert fake_pool.get_db() is direct
+
+def test_pool_size_is_capped(fake_pool, monkeypatch):
+    """Test pools are never sized beyond mysql-connector's limit."""
+    monkeypatch.setattr(fake_pool, 'DB_POOL_SIZE', 64)
+    fake_pool.get_db()
+    assert FakePool.created[0].pool_size == fake_pool.pooling.CNX_POOL_MAXSIZE
+
+def test_pool_skips_session_reset(fake_pool):
+    """Test returning a connection does not cost a reset round trip."""
+    fake_pool.get_db()
+    assert FakePool.created[0].config['pool_reset_session'] is False
+
+@pytest.fixture
+def profile_client(monkeypatch):
+    """Create a test client with query profiling enabled (no database needed)."""
+    import app as app_module
+    from db_profiler import QueryProfiler
+    profiler = QueryProfiler(slow_query_ms=1000)
+    monkeypatch.setattr(app_module, 'db_profiler', profiler)
+    monkeypatch.setattr(app_module, 'DB_PROFILE_TOKEN', 'secret')
+    profiler.record('SELECT 1', None, 0.001)
+    return app.test_client()
+
+def test_db_profile_requires_token(profile_client):
+    """Test the profile report is refused without the right token."""
+    assert profile_client.get('/admin/db-profile').status_code == 403
+    response = profile_client.get('/admin/db-profile', headers={'X-DB-Profile-Token': 'wrong'})
+    assert response.status_code == 403
+
+def test_db_profile_report_and_reset(profile_client):
+    """Test GET shows the report and only POST resets it."""
+    headers = {'X-DB-Profile-Token': 'secret'}
+    response = profile_client.get('/admin/db-profile?reset=1', headers=headers)
+    assert response.status_code == 200
+    assert f'pid {os.getpid()}'.encode() in response.data
+    assert b'SELECT ?' in response.data
+    assert b'SELECT ?' in profile_client.get('/admin/db-profile', headers=headers).data
+
+    response = profile_client.post('/admin/db-profile', headers=headers)
+    assert response.status_code == 200
+    assert f'pid {os.getpid()}'.encode() in response.data
+    assert b'No queries recorded' in profile_client.get('/admin/db-profile', headers=headers).data
+
+def test_db_profile_disabled_without_token(profile_client, monkeypatch):
+    """Test the endpoint does not exist unless a token is configured."""
+    import app as app_module
+    monkeypatch.setattr(app_module, 'DB_PROFILE_TOKEN', None)
+    assert profile_client.get('/admin/db-profile').status_code == 404
@@ -0,0 +1,116 @@
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import time
+from flask import Flask
+from db_profiler import QueryProfiler, fingerprint
+
+class FakeCursor:
+    def __init__(self, delay=0.0):
+        self.delay = delay
+        self.description = [('id',), ('key',)]
+
+    def execute(self, operation, params=None):
+        time.sleep(self.delay)
+
+    def fetchall(self):
+        return [(1, 'idx_short_code')]
+
+    def close(self):
+        pass
+
+class FakeConnection:
+    def __init__(self, delay=0.0):
+        self.delay = delay
+        self.closed = False
+
+    def cursor(self, **kwargs):
+        return FakeCursor(self.delay)
+
+    def close(self):
+        self.closed = True
+
+def test_fingerprint_replaces_values():
+    """Test statements that differ only in values share a fingerprint."""
+    assert fingerprint('SELECT long_url FROM urls WHERE short_code = %s') == \
+        'SELECT long_url FROM urls WHERE short_code = ?'
+    assert fingerprint("SELECT *  FROM urls\n WHERE id = 42 AND user = 'bob'") == \
+        'SELECT * FROM urls WHERE id = ? AND user = ?'
+    assert fingerprint('SELECT * FROM urls WHERE id IN (1, 2, 3)') == \
+        fingerprint('SELECT * FROM urls WHERE id IN (%s, %s)')
+
+def test_profiler_records_per_route():
+    """Test executes are counted under the current endpoint."""
+    profiler = QueryProfiler(slow_query_ms=1000)
+    app = Flask(__name__)
+
+    @app.route('/<code>')
+    def redirect_url(code):
+        cursor = profiler.wrap(FakeConnection()).cursor(dictionary=True)
+        cursor.execute('SELECT long_url FROM urls WHERE short_code = %s', (code,))
+        return ''
+
+    client = app.test_client()
+    client.get('/abc')
+    client.get('/def')
+
+    stats = profiler.snapshot()
+    calls, total, longest = stats[('redirect_url', 'SELECT long_url FROM urls WHERE short_code = ?')]
+    assert calls == 2
+    assert total >= longest
+    assert 'redirect_url' in profiler.report()
+
+def test_profiler_logs_slow_queries_with_explain(caplog):
+    """Test slow statements are logged with their EXPLAIN plan."""
+    profiler = QueryProfiler(slow_query_ms=0, explain_connect=FakeConnection)
+    cursor = profiler.wrap(FakeConnection()).cursor()
+    with caplog.at_level('WARNING', logger='urlshortener.db'):
+        cursor.execute('SELECT * FROM users WHERE username = %s AND password = %s', ('u', 'p'))
+    assert 'Slow query' in caplog.text
+    assert 'key=idx_short_code' in caplog.text
+    assert "'p'" not in caplog.text
+
+def test_profiler_reset():
+    """Test resetting clears recorded statistics."""
+    profiler = QueryProfiler(slow_query_ms=1000)
+    profiler.wrap(FakeConnection()).cursor().execute('SELECT 1')
+    assert profiler.snapshot()
+    profiler.reset()
+    assert profiler.report() == 'No queries recorded.\n'
+
+def test_profiler_explains_each_fingerprint_once(caplog):
+    """Test repeated slow queries reuse the first EXPLAIN plan."""
+    connects = []
+
+    def explain_connect():
+        connects.append(1)
+        return FakeConnection()
+
+    profiler = QueryProfiler(slow_query_ms=0, explain_connect=explain_connect)
+    cursor = profiler.wrap(FakeConnection()).cursor()
+    with caplog.at_level('WARNING', logger='urlshortener.db'):
+        cursor.execute('SELECT long_url FROM urls WHERE short_code = %s', ('abc',))
+        cursor.execute('SELECT long_url FROM urls WHERE short_code = %s', ('def',))
+    assert len(connects) == 1
+    assert caplog.text.count('key=idx_short_code') == 2
+
+def test_profiler_retries_failed_explain(caplog):
+    """Test a failed EXPLAIN is not cached and is retried on the next slow query."""
+    attempts = []
+
+    def explain_connect():
+        attempts.append(1)
+        if len(attempts) == 1:
+            raise ConnectionError('connection refused')
+        return FakeConnection()
+
+    profiler = QueryProfiler(slow_query_ms=0, explain_connect=explain_connect)
+    cursor = profiler.wrap(FakeConnection()).cursor()
+    with caplog.at_level('WARNING', logger='urlshortener.db'):
+        cursor.execute('SELECT long_url FROM urls WHERE short_code = %s', ('abc',))
+        assert 'EXPLAIN failed: connection refused' in caplog.text
+        cursor.execute('SELECT long_url FROM urls WHERE short_code = %s', ('def',))
+        cursor.execute('SELECT long_url FROM urls WHERE short_code = %s', ('ghi',))
+    assert len(attempts) == 2
+    assert caplog.text.count('key=idx_short_code') == 2
@@ -0,0 +1,86 @@
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+from redirect_index import CompactRedirectIndex, encode_code
+
+ITEMS = [
+    ('abc123', 'https://example.com/a'),
+    ('0', 'https://example.com/zero'),
+    ('00', 'https://example.com/double-zero'),
+    ('ZZZZZZZZZZ', 'https://example.com/widest'),
+    ('a-custom-code-that-is-long', 'https://example.com/overflow'),
+    ('café', 'https://example.com/café'),
+]
+
+def test_encode_code_distinguishes_lengths():
+    """Test leading zero digits do not collide with shorter codes."""
+    assert encode_code('0') != encode_code('00')
+    assert encode_code('ZZZZZZZZZZ') < 2 ** 64
+
+def test_encode_code_rejects_unpackable_codes():
+    """Test long or non-alphanumeric codes are not packed."""
+    assert encode_code('') is None
+    assert encode_code('a' * 11) is None
+    assert encode_code('my-code') is None
+
+def test_index_lookup():
+    """Test every indexed code resolves and unknown codes miss."""
+    index = CompactRedirectIndex.build(ITEMS)
+    for code, long_url in ITEMS:
+        assert index.get(code) == long_url
+    assert index.get('missing') is None
+    assert len(index) == len(ITEMS)
+
+def test_index_save_and_load(tmp_path):
+    """Test an index round-trips through its mmapped file format."""
+    path = str(tmp_path / 'redirects.idx')
+    CompactRedirectIndex.build(ITEMS).save(path)
+    index = CompactRedirectIndex.load(path)
+    for code, long_url in ITEMS:
+        assert index.get(code) == long_url
+    assert 'missing' not in index
+
+def test_index_load_rejects_other_files(tmp_path):
+    """Test loading a file that is not an index fails clearly."""
+    path = tmp_path / 'not-an-index'
+    path.write_bytes(b'\0' * 64)
+    with pytest.raises(ValueError):
+        CompactRedirectIndex.load(str(path))
+
+def test_rebuild_in_place_keeps_loaded_index_valid(tmp_path):
+    """Test saving over a loaded index leaves the old mapping readable."""
+    path = str(tmp_path / 'redirects.idx')
+    CompactRedirectIndex.build(ITEMS).save(path)
+    old = CompactRedirectIndex.load(path)
+
+    CompactRedirectIndex.build([('abc123', 'https://example.com/new')]).save(path)
+    for code, long_url in ITEMS:
+        assert old.get(code) == long_url
+    assert CompactRedirectIndex.load(path).get('abc123') == 'https://example.com/new'
+    assert os.listdir(str(tmp_path)) == ['redirects.idx']
+
+def test_index_file_is_little_endian(tmp_path):
+    """Test keys are written little-endian regardless of host byte order."""
+    path = tmp_path / 'redirects.idx'
+    CompactRedirectIndex.build([('1', 'https://example.com/one')]).save(str(path))
+    data = path.read_bytes()
+    # 48-byte header, then the first key
+    assert data[48:56] == encode_code('1').to_bytes(8, 'little')
+
+def test_overflow_codes_are_packed(tmp_path):
+    """Test unpackable codes live in the packed table and count towards nbytes."""
+    custom = [(f'my-custom-code-{i}', f'https://example.com/{i}') for i in range(50)]
+    index = CompactRedirectIndex.build(custom + [('abc', 'https://example.com/abc')])
+    assert index.overflow_count == 50
+    assert index.nbytes() >= sum(len(c) + len(u) for c, u in custom)
+
+    path = str(tmp_path / 'redirects.idx')
+    index.save(path)
+    loaded = CompactRedirectIndex.load(path)
+    for code, long_url in custom:
+        assert loaded.get(code) == long_url
+    assert loaded.get('my-custom-code-999') is None
+    assert loaded.get('abc') == 'https://example.com/abc'
+    assert loaded.overflow_count == 50